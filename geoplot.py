@@ -9,6 +9,7 @@ Key Features:
 - Renders time-series data on a 3D globe
 - Supports both color and size-based visual encoding
 - Generates self-contained HTML files with embedded data
+- Streams data to disk as a GeoJSON text sequence (one feature per line)
 
 Example Usage:
     from agent_torch.visualize import GeoPlot
@@ -26,13 +27,26 @@ Example Usage:
     visualizer.render(simulation_state_trajectory)
 """
 
-import re
-import json
+import base64
+import hashlib
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 from string import Template
 from agent_torch.core.helpers import get_by_path
 
+# Prefer orjson for serialization, falling back to ujson and then the stdlib
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    try:
+        import ujson as json
+    except ImportError:
+        import json
+
 # HTML template with embedded JavaScript for Cesium visualization
 # Uses string.Template placeholders ($variable) for dynamic content
 geoplot_template = """<!doctype html>
@@ -54,69 +68,57 @@ geoplot_template = """<!doctype html>
         // Initialize Cesium with provided access token
         Cesium.Ion.defaultAccessToken = '$accessToken';
         const viewer = new Cesium.Viewer('cesiumContainer');
-        
-        /**
-         * Color interpolation between two Cesium colors
-         * @param {Cesium.Color} color1 - Start color
-         * @param {Cesium.Color} color2 - End color
-         * @param {number} factor - Interpolation factor (0-1)
-         */
-        function interpolateColor(color1, color2, factor) {
-            const result = new Cesium.Color();
-            result.red = color1.red + factor * (color2.red - color1.red);
-            result.green = color1.green + factor * (color2.green - color1.green);
-            result.blue = color1.blue + factor * (color2.blue - color1.blue);
-            result.alpha = '$visualType' == 'size' ? 0.2 : 
-                          color1.alpha + factor * (color2.alpha - color1.alpha);
-            return result;
-        }
+
+        // Feature values arrive quantized to uint16 levels spanning [vmin, vmax]
+        const QUANT_LEVELS = 65535;
+        const vmin = $vmin;
+        const vmax = $vmax;
 
         /**
-         * Gets visualization color based on normalized value
-         * @param {number} value - Current data value
-         * @param {number} min - Minimum value in dataset
-         * @param {number} max - Maximum value in dataset
+         * Recovers the data value from its quantized level
+         * @param {number} level - Quantized value (0-65535)
          */
-        function getColor(value, min, max) {
-            const factor = (value - min) / (max - min);
-            return interpolateColor(Cesium.Color.BLUE, Cesium.Color.RED, factor);
+        function dequantize(level) {
+            return vmin + (level / QUANT_LEVELS) * (vmax - vmin);
         }
 
         /**
-         * Gets point size based on normalized value (for size encoding)
-         * @param {number} value - Current data value
-         * @param {number} min - Minimum value in dataset
-         * @param {number} max - Maximum value in dataset
+         * Gets point size based on quantized value (for size encoding)
+         * @param {number} level - Quantized data value (0-65535)
          */
-        function getPixelSize(value, min, max) {
-            const factor = (value - min) / (max - min);
+        function getPixelSize(level) {
+            const factor = level / QUANT_LEVELS;
             return 100 * (1 + factor);  // Scales from 100 to 200 pixels
         }
 
         /**
          * Processes GeoJSON into time-series format
          * @param {object} geoJsonData - Input GeoJSON data
-         * @returns {object} Processed data with time series and value bounds
+         * @param {Cesium.JulianDate} startTime - Julian date of the first sample
+         * @param {number} startEpoch - Unix time (seconds) of the first sample
+         * @returns {object} Processed data with the time series of each entity
          */
-        function processTimeSeriesData(geoJsonData) {
+        function processTimeSeriesData(geoJsonData, startTime, startEpoch) {
             const timeSeriesMap = new Map();
-            let [minValue, maxValue] = [Infinity, -Infinity];
 
+            // Each feature is one entity with parallel `times` and `values` arrays,
+            // plus its precomputed sample colors as base64-encoded RGBA bytes
             geoJsonData.features.forEach((feature) => {
-                const time = Cesium.JulianDate.fromIso8601(feature.properties.time);
-                const value = feature.properties.value;
-                const coordinates = feature.geometry.coordinates;
-
-                if (!timeSeriesMap.has(feature.properties.id)) {
-                    timeSeriesMap.set(feature.properties.id, []);
-                }
-                timeSeriesMap.get(feature.properties.id).push({ time, value, coordinates });
+                const { id, times, values } = feature.properties;
+                const colors = Uint8Array.from(atob(feature.properties.colors), (c) => c.charCodeAt(0));
+                const samples = times.map((time, i) => {
+                    const value = values[i];
+                    // Sample times are unix seconds, offset from the known start date
+                    const julianTime = Cesium.JulianDate.addSeconds(
+                        startTime, time - startEpoch, new Cesium.JulianDate()
+                    );
+                    return { time: julianTime, value };
+                });
 
-                minValue = Math.min(minValue, value);
-                maxValue = Math.max(maxValue, value);
+                timeSeriesMap.set(id, { coordinates: feature.geometry.coordinates, samples, colors });
             });
 
-            return { timeSeriesMap, minValue, maxValue };
+            return { timeSeriesMap };
         }
 
         /**
@@ -127,14 +129,17 @@ geoplot_template = """<!doctype html>
          */
         function createTimeSeriesEntities(timeSeriesData, startTime, stopTime) {
             const dataSource = new Cesium.CustomDataSource('AgentTorch Simulation');
+            // Sampled properties copy values on insert, so one color can be reused
+            const color = new Cesium.Color();
 
-            for (const [id, timeSeries] of timeSeriesData.timeSeriesMap) {
+            for (const [id, { coordinates, samples, colors }] of timeSeriesData.timeSeriesMap) {
                 const entity = new Cesium.Entity({
                     id: id,
                     availability: new Cesium.TimeIntervalCollection([
                         new Cesium.TimeInterval({ start: startTime, stop: stopTime })
                     ]),
-                    position: new Cesium.SampledPositionProperty(),
+                    // Entities do not move, so the position is constant
+                    position: Cesium.Cartesian3.fromDegrees(coordinates[0], coordinates[1]),
                     point: {
                         pixelSize: '$visualType' == 'size' ? new Cesium.SampledProperty(Number) : 10,
                         color: new Cesium.SampledProperty(Cesium.Color),
@@ -142,17 +147,15 @@ geoplot_template = """<!doctype html>
                     properties: { value: new Cesium.SampledProperty(Number) },
                 });
 
-                timeSeries.forEach(({ time, value, coordinates }) => {
-                    const position = Cesium.Cartesian3.fromDegrees(coordinates[0], coordinates[1]);
-                    entity.position.addSample(time, position);
-                    entity.properties.value.addSample(time, value);
-                    entity.point.color.addSample(time, getColor(value, timeSeriesData.minValue, timeSeriesData.maxValue));
-                    
+                samples.forEach(({ time, value }, i) => {
+                    const offset = i * 4;
+                    entity.properties.value.addSample(time, dequantize(value));
+                    entity.point.color.addSample(time, Cesium.Color.fromBytes(
+                        colors[offset], colors[offset + 1],
+                        colors[offset + 2], colors[offset + 3], color
+                    ));
                     if ('$visualType' == 'size') {
-                        entity.point.pixelSize.addSample(
-                            time,
-                            getPixelSize(value, timeSeriesData.minValue, timeSeriesData.maxValue)
-                        );
+                        entity.point.pixelSize.addSample(time, getPixelSize(value));
                     }
                 });
 
@@ -161,10 +164,22 @@ geoplot_template = """<!doctype html>
             return dataSource;
         }
 
+        /**
+         * Parses a GeoJSON text sequence (one Feature per line)
+         * @param {string} text - Newline-delimited GeoJSON features
+         * @returns {object} A FeatureCollection holding every feature
+         */
+        function parseGeoJsonSeq(text) {
+            const features = text.split('\\n')
+                .filter((line) => line.trim())
+                .map((line) => JSON.parse(line));
+            return { type: 'FeatureCollection', features };
+        }
+
         // Main visualization execution
-        const geoJsons = $data;
         const start = Cesium.JulianDate.fromIso8601('$startTime');
         const stop = Cesium.JulianDate.fromIso8601('$stopTime');
+        const startEpoch = $startEpoch;
 
         // Configure Cesium timeline
         viewer.clock.startTime = start.clone();
@@ -175,17 +190,399 @@ geoplot_template = """<!doctype html>
 
         viewer.timeline.zoomTo(start, stop);
 
-        // Add all data sources to viewer
-        for (const geoJsonData of geoJsons) {
-            const timeSeriesData = processTimeSeriesData(geoJsonData);
+        // Add the data source to viewer once the data is available
+        // (the data is either the embedded collection or a fetch of the GeoJSON sequence)
+        Promise.resolve($data).then((geoJsonData) => {
+            const timeSeriesData = processTimeSeriesData(geoJsonData, start, startEpoch);
             const dataSource = createTimeSeriesEntities(timeSeriesData, start, stop);
             viewer.dataSources.add(dataSource);
             viewer.zoomTo(dataSource);
-        }
+        });
     </script>
 </body>
 </html>"""
 
+# The visualization type is fixed per render, so the size-encoding branches of
+# the template are resolved once here instead of being tested for every sample
+_SIZE_PIXEL_PROPERTY = "pixelSize: '$visualType' == 'size' ? new Cesium.SampledProperty(Number) : 10,"
+_SIZE_PIXEL_SAMPLE = """\
+                    if ('$visualType' == 'size') {
+                        entity.point.pixelSize.addSample(time, getPixelSize(value));
+                    }
+"""
+
+_GEOPLOT_TEMPLATE_COLOR = (
+    geoplot_template
+    .replace(_SIZE_PIXEL_PROPERTY, "pixelSize: 10,")
+    .replace(_SIZE_PIXEL_SAMPLE, "")
+)
+_GEOPLOT_TEMPLATE_SIZE = (
+    geoplot_template
+    .replace(_SIZE_PIXEL_PROPERTY, "pixelSize: new Cesium.SampledProperty(Number),")
+    .replace(
+        _SIZE_PIXEL_SAMPLE,
+        "                    entity.point.pixelSize.addSample(time, getPixelSize(value));\n",
+    )
+)
+
+# The replacements above match the template text exactly, so fail loudly if an
+# edit to the template leaves a branch unspecialized
+for _name, _variant in (("color", _GEOPLOT_TEMPLATE_COLOR), ("size", _GEOPLOT_TEMPLATE_SIZE)):
+    if "$visualType" in _variant:
+        raise RuntimeError(f"The {_name} GeoPlot template was not specialized")
+del _name, _variant
+
+# HTML template for CZML output; Cesium's CzmlDataSource reads the clock and
+# all time-sampled properties from the document, so no processing is needed
+geoplot_czml_template = """<!doctype html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+    <title>AgentTorch Geo-Visualization</title>
+    <!-- CesiumJS libraries -->
+    <script src="https://cesium.com/downloads/cesiumjs/releases/1.95/Build/Cesium/Cesium.js"></script>
+    <link href="https://cesium.com/downloads/cesiumjs/releases/1.95/Build/Cesium/Widgets/widgets.css" rel="stylesheet" />
+    <style>
+        #cesiumContainer { width: 100%; height: 100%; }
+    </style>
+</head>
+<body>
+    <div id="cesiumContainer"></div>
+    <script>
+        // Initialize Cesium with provided access token
+        Cesium.Ion.defaultAccessToken = '$accessToken';
+        const viewer = new Cesium.Viewer('cesiumContainer');
+
+        // The data is either the embedded CZML document or the URL of the .czml file;
+        // the viewer tracks the document's clock once the data source is added
+        Cesium.CzmlDataSource.load($data).then((dataSource) => {
+            viewer.dataSources.add(dataSource);
+            viewer.zoomTo(dataSource);
+        });
+    </script>
+</body>
+</html>"""
+
+# Buffer size for streamed data files, and the most chunks passed to one writev()
+_WRITE_BUFFER_SIZE = 8 * 1024 * 1024
+_IOV_MAX = 1024
+
+def _split_template(template):
+    """Split a string.Template source into literal text and placeholder names
+    
+    Args:
+        template: Template source using $variable placeholders
+    
+    Returns:
+        List alternating UTF-8 encoded literal chunks (even indices) and
+        placeholder names (odd indices), always starting and ending with a
+        literal chunk
+    """
+    parts = []
+    literal = []
+    last = 0
+    for match in Template.pattern.finditer(template):
+        literal.append(template[last:match.start()])
+        last = match.end()
+        name = match.group("named") or match.group("braced")
+        if name is not None:
+            parts.append("".join(literal).encode("utf-8"))
+            parts.append(name)
+            literal = []
+        elif match.group("escaped") is not None:
+            literal.append("$")
+        else:
+            raise ValueError(f"Invalid placeholder in template at index {match.start()}")
+    literal.append(template[last:])
+    parts.append("".join(literal).encode("utf-8"))
+    return parts
+
+
+def _fill_template(parts, values):
+    """Fill a template split by `_split_template` without joining it
+    
+    Args:
+        parts: Literal chunks and placeholder names from `_split_template`
+        values: Mapping of placeholder names to str, already encoded bytes,
+            or a list of bytes chunks that is spliced in as is
+    
+    Returns:
+        List of bytes chunks making up the filled-in template
+    """
+    chunks = []
+    for i, part in enumerate(parts):
+        if i % 2 == 0:
+            chunks.append(part)
+            continue
+        value = values[part]
+        if isinstance(value, str):
+            chunks.append(value.encode("utf-8"))
+        elif isinstance(value, bytes):
+            chunks.append(value)
+        else:
+            chunks.extend(value)
+    return chunks
+
+
+def _json_array_chunks(prefix, items, suffix):
+    """Lay out serialized items as comma-separated chunks without joining them
+    
+    Args:
+        prefix: Bytes opening the array (e.g. b"[")
+        items: Serialized JSON values
+        suffix: Bytes closing the array (e.g. b"]")
+    
+    Returns:
+        List of bytes chunks that concatenate to the JSON text
+    """
+    chunks = [prefix]
+    for i, item in enumerate(items):
+        if i:
+            chunks.append(b",")
+        chunks.append(item)
+    chunks.append(suffix)
+    return chunks
+
+
+def _write_chunks(path, chunks):
+    """Write bytes chunks to a file, gathering them into as few syscalls as possible
+    
+    Args:
+        path: Output file path
+        chunks: List of bytes objects, written in order
+    """
+    if not hasattr(os, "writev"):
+        # Buffered writes retry short writes, unlike a raw FileIO
+        with open(path, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+            f.writelines(chunks)
+        return
+
+    with open(path, "wb", buffering=0) as f:
+        pending = [memoryview(chunk) for chunk in chunks if chunk]
+        while pending:
+            written = os.writev(f.fileno(), pending[:_IOV_MAX])
+            # Drop fully written chunks and trim a partially written one
+            while pending and written >= len(pending[0]):
+                written -= len(pending[0])
+                pending.pop(0)
+            if written:
+                pending[0] = pending[0][written:]
+
+
+def _link_or_copy(src, dst, link=True):
+    """Replace `dst` with a hardlink to, or a copy of, `src`
+    
+    Args:
+        src: Existing file
+        dst: Path to create or replace
+        link: Whether to try a hardlink first; copies are used when linking
+            is disabled or unsupported
+    """
+    tmp = f"{dst}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    if link:
+        try:
+            os.link(src, tmp)
+        except OSError:
+            link = False
+    if not link:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+def _to_builtin(obj):
+    """Convert NumPy arrays and scalars for encoders that cannot handle them"""
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(obj):
+    """Serialize an object to UTF-8 encoded JSON bytes
+    
+    NumPy arrays and scalars are serialized natively by orjson and converted
+    to Python values only when falling back to another encoder.
+    
+    Args:
+        obj: The object to serialize
+    
+    Returns:
+        The JSON document as bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_to_builtin, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, ensure_ascii=False, default=_to_builtin).encode("utf-8")
+
+
+def _value_range(values):
+    """Return the (min, max) of the finite feature values, (0, 0) if there are none"""
+    finite = values[np.isfinite(values)]
+    if not finite.size:
+        return 0.0, 0.0
+    return float(finite.min()), float(finite.max())
+
+
+def _normalize(values, vmin, vmax):
+    """Scale feature values to [0, 1] between vmin and vmax, mapping NaN to 0"""
+    norm = (values - vmin) / ((vmax - vmin) or 1.0)
+    return np.clip(np.nan_to_num(norm, nan=0.0), 0.0, 1.0)
+
+
+def _quantize(values, vmin, vmax):
+    """Map feature values onto uint16 levels, with 0 at vmin and 65535 at vmax
+    
+    Args:
+        values: Array of feature values
+        vmin: Value mapped to level 0
+        vmax: Value mapped to level 65535
+    
+    Returns:
+        Array of uint16 levels with the same shape as `values`
+    """
+    return np.rint(_normalize(values, vmin, vmax) * 65535).astype(np.uint16)
+
+
+def _rgba(norm, size_mode):
+    """Blue-to-red RGBA bytes for normalized values
+    
+    Args:
+        norm: Array of values normalized to [0, 1]
+        size_mode: Whether values are also encoded as point size, in which
+            case the colors are translucent
+    
+    Returns:
+        uint8 array with a trailing axis of (red, green, blue, alpha)
+    """
+    red = np.rint(norm * 255).astype(np.uint8)
+    rgba = np.zeros(norm.shape + (4,), dtype=np.uint8)
+    rgba[..., 0] = red
+    rgba[..., 2] = 255 - red
+    rgba[..., 3] = 51 if size_mode else 255
+    return rgba
+
+
+def _build_features(
+    offset, coord_pairs, entity_values, epoch_times, vmin, vmax, size_mode,
+):
+    """Serialize the GeoJSON features for a contiguous slice of entities
+    
+    Each entity becomes a single Point feature whose properties hold its
+    whole time series, so the coordinates are stored once per entity. The
+    value range is stored alongside the quantized levels, so the data file
+    can be decoded on its own, and the sample colors travel with the feature
+    as base64-encoded RGBA bytes. Runs
+    in a worker process, so it only takes picklable arrays and returns bytes
+    rather than feature dicts.
+    
+    Args:
+        offset: Index of the first entity in the slice
+        coord_pairs: (n, 2) array of [long, lat] coordinates
+        entity_values: (n, T) array of quantized feature values
+        epoch_times: Array of unix timestamps in seconds, one per step
+        vmin: Value represented by level 0
+        vmax: Value represented by level 65535
+        size_mode: Whether values are also encoded as point size
+    
+    Returns:
+        List of serialized features, one per entity
+    """
+    colors = _rgba(entity_values / 65535, size_mode)
+    return [
+        _dumps({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": coord_pairs[idx]},
+            "properties": {
+                "id": f"entity_{offset + idx}",
+                "times": epoch_times,
+                "values": entity_values[idx],
+                "vmin": vmin,
+                "vmax": vmax,
+                "colors": base64.b64encode(colors[idx].tobytes()).decode("ascii"),
+            },
+        })
+        for idx in range(len(coord_pairs))
+    ]
+
+
+def _interleave_bytes(times, samples):
+    """Interleave sample times with byte samples into CZML [time, ...] rows
+    
+    The bytes are never cast to float: the result is int64 when every time
+    is a whole number of seconds, and an object array of Python ints and
+    floats otherwise.
+    
+    Args:
+        times: (n, T) array of sample times
+        samples: (n, T, k) uint8 array of samples
+    
+    Returns:
+        (n, T * (k + 1)) array of interleaved samples, one row per entity
+    """
+    dtype = np.int64 if np.all(np.mod(times, 1) == 0) else object
+    rows = np.empty(samples.shape[:-1] + (samples.shape[-1] + 1,), dtype=dtype)
+    rows[..., 0] = times
+    rows[..., 1:] = samples
+    return rows.reshape(samples.shape[0], samples.shape[1] * rows.shape[-1])
+
+
+def _build_czml_packets(
+    offset, coord_pairs, entity_values, time_offsets, epoch, availability,
+    vmin, vmax, size_mode,
+):
+    """Serialize the CZML packets for a contiguous slice of entities
+    
+    Colors (and sizes for size encoding) are computed here rather than in the
+    browser, as interleaved [time, ...] sample arrays relative to `epoch`.
+    Non-finite values are left out of the value samples, so the document is
+    valid JSON with every encoder.
+    
+    Args:
+        offset: Index of the first entity in the slice
+        coord_pairs: (n, 2) array of [long, lat] coordinates
+        entity_values: (n, T) array of feature values
+        time_offsets: Seconds from `epoch` for each step
+        epoch: ISO start time the sample times are relative to
+        availability: ISO interval during which the entities are shown
+        vmin: Minimum feature value in the simulation
+        vmax: Maximum feature value in the simulation
+        size_mode: Whether values are also encoded as point size
+    
+    Returns:
+        List of serialized packets, one per entity
+    """
+    num_entities = len(coord_pairs)
+    norm = _normalize(entity_values, vmin, vmax)
+    times = np.broadcast_to(time_offsets, norm.shape)
+
+    rgba = _interleave_bytes(times, _rgba(norm, size_mode))
+    finite = np.isfinite(entity_values)
+    sizes = np.stack([times, 100 * (1 + norm)], axis=-1).reshape(num_entities, -1)
+    positions = np.column_stack([coord_pairs, np.zeros(num_entities)])
+
+    return [
+        _dumps({
+            "id": f"entity_{offset + idx}",
+            "availability": availability,
+            "position": {"cartographicDegrees": positions[idx]},
+            "point": {
+                "color": {"epoch": epoch, "rgba": rgba[idx]},
+                "pixelSize": (
+                    {"epoch": epoch, "number": sizes[idx]} if size_mode else 10
+                ),
+            },
+            "properties": {"value": {
+                "epoch": epoch,
+                "number": np.column_stack([
+                    time_offsets[finite[idx]], entity_values[idx][finite[idx]]
+                ]).ravel(),
+            }},
+        })
+        for idx in range(num_entities)
+    ]
+
+
 def read_var(state, var_path):
     """Helper function to access nested dictionary values using path strings
     
@@ -196,7 +593,7 @@ def read_var(state, var_path):
     Returns:
         The value at the specified path
     """
-    return get_by_path(state, re.split("/", var_path))
+    return get_by_path(state, var_path.split("/"))
 
 
 class GeoPlot:
@@ -209,8 +606,28 @@ class GeoPlot:
         entity_position: Path to coordinate data in state
         entity_property: Path to feature values in state
         visualization_type: Either 'color' or 'size' encoding
+        output_format: Either 'geojson' or 'czml' data output
+        stream_only: Load data from the data file instead of embedding it
+        workers: Number of processes used to build the features
+        cache_dir: Directory of previously rendered outputs, or None
     """
 
+    # Below this many entities, process start-up outweighs the parallel speedup
+    _PARALLEL_MIN_ENTITIES = 2048
+
+    # The HTML templates are constant, so split them at their placeholders once
+    _TEMPLATE_PARTS = {
+        "color": _split_template(_GEOPLOT_TEMPLATE_COLOR),
+        "size": _split_template(_GEOPLOT_TEMPLATE_SIZE),
+    }
+    _CZML_TEMPLATE_PARTS = _split_template(geoplot_czml_template)
+
+    # Bump when the output layout changes, so stale cache entries are not reused
+    _CACHE_VERSION = 1
+
+    # Data file extension for each supported output format
+    _DATA_EXTENSIONS = {"geojson": "geojsonl", "czml": "czml"}
+
     def __init__(self, config, options):
         """Initialize the geographic visualizer
         
@@ -222,96 +639,281 @@ class GeoPlot:
                 - coordinates: Path to location data
                 - feature: Path to visualization values
                 - visualization_type: 'color' or 'size'
+                - output_format: 'geojson' (default) or 'czml', which
+                  writes a CZML document that Cesium animates natively
+                - stream_only: If True, the HTML loads the GeoJSON
+                  sequence or CZML file at load time instead of embedding
+                  the data (the page must then be served over HTTP)
+                - workers: Processes used to build features for large
+                  simulations (defaults to 1, i.e. no multiprocessing).
+                  With more than one worker, scripts must guard their
+                  entry point with `if __name__ == "__main__":` on
+                  platforms that spawn worker processes (macOS, Windows,
+                  forkserver on Linux)
+                - cache_dir: Opt-in directory where rendered outputs are
+                  cached and reused when the configuration and data are
+                  unchanged (defaults to None, i.e. no caching). Entries
+                  are never evicted, and a cached page keeps the start
+                  time of the render that produced it
         """
         self.config = config
         self.cesium_token = options["cesium_token"]
         self.step_time = options["step_time"]
         self.entity_position = options["coordinates"]
         self.entity_property = options["feature"]
+        self._pos_path = self.entity_position.split("/")
+        self._prop_path = self.entity_property.split("/")
         self.visualization_type = options.get("visualization_type", "color")
+        self.output_format = options.get("output_format", "geojson")
+        self.stream_only = options.get("stream_only", False)
+        self.workers = options.get("workers") or 1
+        self.cache_dir = options.get("cache_dir")
+
+        if self.output_format not in self._DATA_EXTENSIONS:
+            raise ValueError(
+                f"output_format must be one of {tuple(self._DATA_EXTENSIONS)}, "
+                f"got {self.output_format!r}"
+            )
+
+    def _map_entities(self, builder, per_entity, *shared):
+        """Yield the results of `builder` over slices of entities, in entity order
+        
+        Large simulations are split into one slice per worker and built in a
+        process pool; small ones are built in the current process.
+        
+        Args:
+            builder: Module-level function called as
+                builder(offset, *entity_slices, *shared)
+            per_entity: Arrays whose first axis is the entity index
+            shared: Arguments passed unchanged to every call
+        """
+        num_entities = len(per_entity[0])
+        workers = self.workers if num_entities >= self._PARALLEL_MIN_ENTITIES else 1
+        bounds = np.linspace(0, num_entities, workers + 1, dtype=int)
+        calls = [
+            (lo, *(array[lo:hi] for array in per_entity), *shared)
+            for lo, hi in zip(bounds[:-1], bounds[1:])
+        ]
+
+        if workers == 1:
+            yield from (builder(*call) for call in calls)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(builder, *zip(*calls))
+
+    def _cache_key(self, coords_np, fv):
+        """Digest of everything that determines the rendered output"""
+        digest = hashlib.blake2b(digest_size=16)
+        # Salt with the format version and templates so upgrades invalidate entries
+        digest.update(repr((
+            self._CACHE_VERSION, _GEOPLOT_TEMPLATE_COLOR, _GEOPLOT_TEMPLATE_SIZE,
+            geoplot_czml_template,
+        )).encode("utf-8"))
+        digest.update(repr((
+            self.config, self.cesium_token, self.step_time,
+            self.visualization_type, self.output_format, self.stream_only,
+            coords_np.shape, fv.shape,
+        )).encode("utf-8"))
+        digest.update(coords_np.tobytes())
+        digest.update(fv.tobytes())
+        return digest.hexdigest()
+
+    def _render_geojson(self, geojson_file, coord_pairs, entity_values, ts_index):
+        """Write the GeoJSON sequence file and fill the GeoJSON HTML template
+        
+        Returns:
+            The HTML page as a list of bytes chunks
+        """
+        # Offsets from the unix epoch are independent of the index's time unit
+        epoch_times = (
+            (ts_index - pd.Timestamp(0, tz="UTC")) / pd.Timedelta(seconds=1)
+        ).to_numpy(dtype=np.float64)
+
+        # Values only drive colors and sizes, so uint16 precision is plenty
+        vmin, vmax = _value_range(entity_values)
+        levels = _quantize(entity_values, vmin, vmax)
+
+        # Convert simulation data to GeoJSON, streaming each chunk of entities
+        # to disk as it is built; only serialized bytes are kept for embedding
+        features = []
+        with open(geojson_file, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+            for chunk in self._map_entities(
+                _build_features, (coord_pairs, levels), epoch_times, vmin, vmax,
+                self.visualization_type == "size",
+            ):
+                f.writelines(feature + b"\n" for feature in chunk)
+                if not self.stream_only:
+                    features.extend(chunk)
+
+        # Either embed the collected data or fetch the sequence file in the browser
+        if self.stream_only:
+            data = (
+                f"fetch({_dumps(os.path.basename(geojson_file)).decode('utf-8')})"
+                ".then((response) => response.text()).then(parseGeoJsonSeq)"
+            )
+        else:
+            data = _json_array_chunks(
+                b'{"type":"FeatureCollection","features":[', features, b"]}"
+            )
+
+        template_parts = self._TEMPLATE_PARTS[
+            "size" if self.visualization_type == "size" else "color"
+        ]
+        return _fill_template(template_parts, {
+            "accessToken": self.cesium_token,
+            "startTime": ts_index[0].isoformat(),
+            "stopTime": ts_index[-1].isoformat(),
+            "startEpoch": repr(float(epoch_times[0])),
+            "vmin": _dumps(vmin),  # finite, so always a valid JS number
+            "vmax": _dumps(vmax),
+            "data": data,
+        })
+
+    def _render_czml(self, sim_name, czml_file, coord_pairs, entity_values, ts_index):
+        """Write the CZML document and fill the CZML HTML template
+        
+        Returns:
+            The HTML page as a list of bytes chunks
+        """
+        start, stop = ts_index[0].isoformat(), ts_index[-1].isoformat()
+        availability = f"{start}/{stop}"
+        time_offsets = np.arange(len(ts_index)) * float(self.step_time)
+        vmin, vmax = _value_range(entity_values)
+
+        # The document packet carries the clock settings used by the viewer
+        document = _dumps({
+            "id": "document",
+            "name": sim_name,
+            "version": "1.0",
+            "clock": {
+                "interval": availability,
+                "currentTime": start,
+                "multiplier": 3600,  # 1 simulated hour per real second
+                "range": "LOOP_STOP",
+            },
+        })
+
+        # Stream the packets into the CZML array as each chunk is built
+        packets = [document]
+        with open(czml_file, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+            f.write(b"[" + document)
+            for chunk in self._map_entities(
+                _build_czml_packets, (coord_pairs, entity_values),
+                time_offsets, start, availability, vmin, vmax,
+                self.visualization_type == "size",
+            ):
+                f.writelines(b"," + packet for packet in chunk)
+                if not self.stream_only:
+                    packets.extend(chunk)
+            f.write(b"]")
+
+        if self.stream_only:
+            data = _dumps(os.path.basename(czml_file))
+        else:
+            data = _json_array_chunks(b"[", packets, b"]")
+
+        return _fill_template(self._CZML_TEMPLATE_PARTS, {
+            "accessToken": self.cesium_token,
+            "data": data,
+        })
 
     def render(self, state_trajectory):
         """Generate visualization files from simulation data
         
         Creates two files:
-        1. GeoJSON file containing all visualization data
-        2. HTML file with embedded Cesium visualization
+        1. Data file with one feature/packet per entity: a GeoJSON text
+           sequence (.geojsonl) or, with output_format='czml', a CZML
+           document (.czml)
+        2. HTML file with the Cesium visualization, either embedding the
+           data or loading the data file when `stream_only` is set
+        
+        If caching is enabled and `cache_dir` already holds output for the
+        same configuration and data, it is linked into place instead
+        (keeping its original start time).
         
         Args:
             state_trajectory: List of simulation states over time
+        
+        Raises:
+            ValueError: If the trajectory has fewer than two states, or the
+                feature and coordinate counts differ
         """
-        # Initialize data containers
-        coordinates = []
-        feature_values = []
         sim_name = self.config["simulation_metadata"]["name"]
         
         # Output filenames
-        geojson_file = f"{sim_name}.geojson"
+        data_file = f"{sim_name}.{self._DATA_EXTENSIONS[self.output_format]}"
         html_file = f"{sim_name}.html"
 
-        # Extract coordinates and values from each state
-        for state in state_trajectory[:-1]:  # Exclude final state if incomplete
-            final_state = state[-1]  # Get terminal state of this trajectory
-            
-            # Read coordinates and convert to list format
-            coordinates = np.array(
-                read_var(final_state, self.entity_position)
-            ).tolist()
-            
-            # Read feature values and flatten to 1D list
-            feature_values.append(
-                np.array(
-                    read_var(final_state, self.entity_property)
-                ).flatten().tolist()
+        # The final state is excluded below, so at least one other step is needed
+        if len(state_trajectory) < 2:
+            raise ValueError(
+                "state_trajectory must contain at least two states to render, "
+                f"got {len(state_trajectory)}"
             )
 
-        # Generate timestamps for the entire simulation
-        start_time = pd.Timestamp.utcnow()
-        total_steps = (
-            self.config["simulation_metadata"]["num_episodes"] *
-            self.config["simulation_metadata"]["num_steps_per_episode"]
+        # Entity coordinates are static, so read them once as an (N, 2) array
+        coords_np = np.asarray(
+            get_by_path(state_trajectory[0][-1], self._pos_path), dtype=np.float64
         )
-        timestamps = [
-            start_time + pd.Timedelta(seconds=i * self.step_time)
-            for i in range(total_steps)
-        ]
 
-        # Convert simulation data to GeoJSON format
-        geojson_data = []
-        for idx, coord in enumerate(coordinates):
-            features = []
-            for time, values in zip(timestamps, feature_values):
-                features.append({
-                    "type": "Feature",
-                    "geometry": {
-                        "type": "Point",
-                        "coordinates": [coord[1], coord[0]]  # GeoJSON order: [long, lat]
-                    },
-                    "properties": {
-                        "id": f"entity_{idx}",
-                        "value": values[idx],
-                        "time": time.isoformat()
-                    }
-                })
-            
-            geojson_data.append({
-                "type": "FeatureCollection",
-                "features": features
-            })
-
-        # Save GeoJSON data to file
-        with open(geojson_file, "w", encoding="utf-8") as f:
-            json.dump(geojson_data, f, ensure_ascii=False, indent=2)
-
-        # Generate and save HTML visualization
-        template = Template(geoplot_template)
-        html_content = template.substitute({
-            "accessToken": self.cesium_token,
-            "startTime": timestamps[0].isoformat(),
-            "stopTime": timestamps[-1].isoformat(),
-            "data": json.dumps(geojson_data),
-            "visualType": self.visualization_type
-        })
+        # Extract feature values from each state into a preallocated (T, N) array,
+        # sized from the first step and converted straight to float32
+        steps = state_trajectory[:-1]  # Exclude final state if incomplete
+        first = np.asarray(get_by_path(steps[0][-1], self._prop_path), dtype=np.float32).ravel()
+        if first.size != len(coords_np):
+            raise ValueError(
+                f"{self.entity_property!r} has {first.size} values per step but "
+                f"{self.entity_position!r} has {len(coords_np)} coordinates"
+            )
+        fv = np.empty((len(steps), first.size), dtype=np.float32)
+        fv[0] = first
+        for i in range(1, len(steps)):
+            final_state = steps[i][-1]  # Get terminal state of this trajectory
+            fv[i] = np.asarray(get_by_path(final_state, self._prop_path), dtype=np.float32).ravel()
+
+        # Reuse the cached output when the configuration and data are unchanged
+        if self.cache_dir is not None:
+            key = self._cache_key(coords_np, fv)
+            cached_data = os.path.join(self.cache_dir, f"{key}{os.path.splitext(data_file)[1]}")
+            cached_html = os.path.join(self.cache_dir, f"{key}.html")
+            if os.path.exists(cached_data) and os.path.exists(cached_html):
+                _link_or_copy(cached_data, data_file)
+                _link_or_copy(cached_html, html_file)
+                return
+
+        # Earlier outputs may be hardlinks into a cache, so never truncate them
+        for path in (data_file, html_file):
+            if os.path.exists(path):
+                os.remove(path)
+
+        # Generate one timestamp per recorded step
+        ts_index = pd.date_range(
+            start=pd.Timestamp.utcnow(),
+            periods=len(fv),
+            freq=pd.Timedelta(seconds=self.step_time),
+        )
+
+        # Precompute per-entity and per-step columns once, outside the feature loop
+        # (rows are kept C-contiguous so orjson can serialize them directly)
+        coord_pairs = np.ascontiguousarray(coords_np[:, [1, 0]])  # GeoJSON order: [long, lat]
+        entity_values = np.ascontiguousarray(fv.T)  # shape (N, T)
+
+        # Write the data file and generate the HTML visualization
+        if self.output_format == "czml":
+            html_chunks = self._render_czml(
+                sim_name, data_file, coord_pairs, entity_values, ts_index
+            )
+        else:
+            html_chunks = self._render_geojson(
+                data_file, coord_pairs, entity_values, ts_index
+            )
+
+        _write_chunks(html_file, html_chunks)
 
-        with open(html_file, "w", encoding="utf-8") as f:
-            f.write(html_content)
+        # Cache the HTML last, so a cache hit always has both files; entries are
+        # copies, so later edits to the outputs cannot reach the cache
+        if self.cache_dir is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            _link_or_copy(data_file, cached_data, link=False)
+            _link_or_copy(html_file, cached_html, link=False)